@@ -1,21 +1,36 @@
 import os
 import re
-from functools import lru_cache
-
-
-import socket
-print(socket.gethostbyname("oauth2.googleapis.com"))
-
+import asyncio
+import hashlib
+import logging
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 
+import aiohttp
+import diskcache
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from aiolimiter import AsyncLimiter
+from tenacity import (before_sleep_log, retry, retry_if_exception,
+                      stop_after_attempt, wait_exponential)
+from tqdm.asyncio import tqdm
 
 from dotenv import load_dotenv
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
-from pytube import Search
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadError
 
 # YouTube Data API imports
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 # Load environment variables from .env file
 load_dotenv()
@@ -25,61 +40,399 @@ SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
 SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
 
 # --- Spotify Setup using Client Credentials Flow ---
+def make_requests_session() -> requests.Session:
+    """
+    Creates a requests session with a connection pool sized for concurrent use,
+    retrying rate-limited and transient server errors with backoff.
+    """
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                                          max_retries=retries))
+    return session
+
+# Token requests and API calls share one pooled session, so connections are reused.
+spotify_session = make_requests_session()
 sp_auth = SpotifyClientCredentials(client_id=SPOTIFY_CLIENT_ID,
-                                   client_secret=SPOTIFY_CLIENT_SECRET)
-sp = spotipy.Spotify(auth_manager=sp_auth)
+                                   client_secret=SPOTIFY_CLIENT_SECRET,
+                                   requests_session=spotify_session)
+sp = spotipy.Spotify(auth_manager=sp_auth, requests_session=spotify_session)
+
+# Refresh the Spotify token this long before it expires.
+TOKEN_REFRESH_MARGIN = 60  # seconds
+# How long to wait before trying again when a refresh fails or the expiry is unknown.
+TOKEN_RETRY_DELAY = 30  # seconds
+
+def prefetch_spotify_token():
+    """
+    Fetches the Spotify access token on a daemon thread, so it overlaps with the
+    user typing at a prompt without holding up exit if they hit Ctrl-C.
+    """
+    def fetch():
+        try:
+            sp_auth.get_access_token(as_dict=False)
+        except Exception as exc:
+            logger.warning(f"Spotify token prefetch failed: {exc}")
+
+    threading.Thread(target=fetch, daemon=True).start()
+
+async def keep_spotify_token_fresh():
+    """
+    Fetches the Spotify access token if it isn't cached yet, then refreshes it
+    shortly before each expiry so concurrent requests never stall on a token
+    refresh mid-run.
+    """
+    while True:
+        try:
+            token_info = sp_auth.cache_handler.get_cached_token()
+            if token_info is None or token_info['expires_at'] - time.time() <= TOKEN_REFRESH_MARGIN:
+                await asyncio.to_thread(sp_auth.get_access_token, as_dict=False,
+                                        check_cache=False)
+                token_info = sp_auth.cache_handler.get_cached_token()
+            if token_info is None:
+                # The token cache couldn't be written, so the expiry is unknown.
+                logger.warning("Spotify token cache unavailable; cannot schedule refresh")
+                delay = TOKEN_RETRY_DELAY
+            else:
+                delay = token_info['expires_at'] - time.time() - TOKEN_REFRESH_MARGIN
+        except Exception as exc:
+            logger.warning(f"Spotify token refresh failed: {exc}")
+            delay = TOKEN_RETRY_DELAY
+        await asyncio.sleep(max(delay, 0))
+
+# Spotify IDs are exactly 22 base62 characters; YouTube video IDs are 11.
+_PLAYLIST_RE = re.compile(r'open\.spotify\.com/playlist/([A-Za-z0-9]{22})')
+_YT_VIDEO_RE = re.compile(r'[?&]v=([A-Za-z0-9_-]{11})')
 
 def extract_spotify_playlist_id(playlist_url: str) -> str:
     """Extracts the playlist ID from a Spotify playlist URL."""
-    match = re.search(r'open\.spotify\.com/playlist/([a-zA-Z0-9]+)', playlist_url)
+    match = _PLAYLIST_RE.search(playlist_url)
     if match:
         return match.group(1)
     raise ValueError("Invalid Spotify playlist URL")
 
-def get_spotify_tracks(playlist_url: str):
-    """Fetches track names and artist(s) from a Spotify playlist."""
+def extract_youtube_video_id_from_url(video_url: str) -> str:
+    """Extracts the video ID from a YouTube watch URL."""
+    match = _YT_VIDEO_RE.search(video_url)
+    if match:
+        return match.group(1)
+    raise ValueError("Invalid YouTube video URL")
+
+# --- Persistent Cache ---
+# Search results and playlist contents survive between runs, so re-converting
+# the same (or an overlapping) playlist skips the network entirely.
+CACHE_DIR = os.path.expanduser('~/.cache/spotify_to_yt')
+CACHE_EXPIRE = 30 * 86400  # seconds
+cache = diskcache.Cache(CACHE_DIR)
+
+def normalize_query(query: str) -> str:
+    """Lowercases a search query and collapses its whitespace."""
+    return " ".join(query.lower().split())
+
+def search_cache_key(query: str) -> str:
+    """Returns the cache key for a YouTube search query."""
+    return hashlib.blake2b(normalize_query(query).encode(), digest_size=16).hexdigest()
+
+SPOTIFY_PAGE_SIZE = 100
+
+def track_query(item) -> str:
+    """Builds a YouTube search query from a Spotify playlist item, or None for empty slots."""
+    track = item['track']
+    if not track:
+        return None
+    # Build a search query using track name and artist(s)
+    artists = ", ".join([artist['name'] for artist in track['artists']])
+    return f"{track['name']} {artists}"
+
+def page_queries(page):
+    """Yields (playlist position, search query) for each track on a Spotify page."""
+    for index, item in enumerate(page['items'], start=page['offset']):
+        query = track_query(item)
+        if query:
+            yield index, query
+
+async def iter_spotify_tracks(session: aiohttp.ClientSession, playlist_url: str, on_total=None):
+    """
+    Yields (playlist position, search query) for each track in a Spotify playlist
+    as soon as its page arrives. Pages after the first are fetched concurrently,
+    so tracks may come out of order. on_total, if given, is called with the
+    track count as soon as it is known.
+    """
     playlist_id = extract_spotify_playlist_id(playlist_url)
-    results = sp.playlist(playlist_id)
-    tracks = []
-    for item in results['tracks']['items']:
-        track = item['track']
-        if track:
-            # Build a search query using track name and artist(s)
-            artists = ", ".join([artist['name'] for artist in track['artists']])
-            query = f"{track['name']} {artists}"
-            tracks.append(query)
-    return tracks
+    # The snapshot ID changes whenever the playlist is edited, so an unchanged
+    # playlist is served from the cache.
+    # spotipy calls block, so they run in a thread to keep the event loop free.
+    playlist = await asyncio.to_thread(sp.playlist, playlist_id, fields='snapshot_id')
+    snapshot_id = playlist['snapshot_id']
+    key = f"spotify:{playlist_id}:{snapshot_id}"
+    if (tracks := cache.get(key)) is not None:
+        if on_total:
+            on_total(len(tracks))
+        for item in enumerate(tracks):
+            yield item
+        return
+    first = await asyncio.to_thread(sp.playlist_items, playlist_id, limit=SPOTIFY_PAGE_SIZE,
+                                    offset=0, additional_types=('track',))
+    if on_total:
+        # Includes empty slots (removed tracks), so it's an upper bound.
+        on_total(first['total'])
+    token = await asyncio.to_thread(sp_auth.get_access_token, as_dict=False)
+    offsets = range(SPOTIFY_PAGE_SIZE, first['total'], SPOTIFY_PAGE_SIZE)
+    pending = [
+        asyncio.ensure_future(fetch_spotify_page(session, token, playlist_id, offset))
+        for offset in offsets
+    ]
+    found = []
+    try:
+        for item in page_queries(first):
+            found.append(item)
+            yield item
+        for next_page in asyncio.as_completed(pending):
+            for item in page_queries(await next_page):
+                found.append(item)
+                yield item
+    finally:
+        for task in pending:
+            task.cancel()
+    cache.set(key, [query for _, query in sorted(found)], expire=CACHE_EXPIRE)
+
+# --- Concurrency Limits ---
+# Cap in-flight requests and overall request rate so concurrent searches and
+# inserts stay under YouTube's rate limits instead of tripping HTTP 429s.
+SEM = asyncio.Semaphore(16)
+YT_LIMITER = AsyncLimiter(max_rate=60, time_period=60)
+SPOTIFY_SEM = asyncio.Semaphore(8)
+# Search workers consuming Spotify tracks, and how many tracks may wait for them.
+N_WORKERS = 16
+TRACK_QUEUE_SIZE = 200
+
+# Per-request limit, well below aiohttp's 300s default, so a stalled response
+# raises asyncio.TimeoutError and goes through the retry policy.
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+def make_session() -> aiohttp.ClientSession:
+    """
+    Creates the aiohttp session shared by every YouTube and Spotify request in a
+    run, so each host costs one TLS handshake instead of one per request.
+    """
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=32, ttl_dns_cache=300,
+                                     keepalive_timeout=60)
+    return aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+
+# Longest Retry-After we honour, so a misbehaving server can't stall the run.
+MAX_RETRY_AFTER = 60  # seconds
+
+def retry_after_seconds(resp: aiohttp.ClientResponse, default: float = 1.0) -> float:
+    """Returns how long to wait before retrying, based on the Retry-After header."""
+    try:
+        wait = float(resp.headers.get("Retry-After", default))
+    except ValueError:
+        # Retry-After may also be an HTTP date; fall back to the default wait.
+        wait = default
+    return min(max(wait, 0), MAX_RETRY_AFTER)
+
+# --- Logging ---
+logger = logging.getLogger(__name__)
+log_queue = queue.Queue()
+
+class TqdmHandler(logging.Handler):
+    """Writes log records above any live tqdm progress bar instead of through it."""
+
+    def emit(self, record):
+        try:
+            tqdm.write(self.format(record), file=sys.stderr)
+        except Exception:
+            self.handleError(record)
+
+def setup_logging() -> QueueListener:
+    """
+    Routes log records through a queue to a single background writer thread,
+    so coroutines never block on terminal I/O. Returns the started listener.
+    """
+    logging.basicConfig(format="%(message)s", handlers=[QueueHandler(log_queue)])
+    # Only this script's progress messages at INFO; libraries stay at WARNING.
+    logger.setLevel(logging.INFO)
+    listener = QueueListener(log_queue, TqdmHandler())
+    listener.start()
+    return listener
+
+def prompt(message: str) -> str:
+    """
+    Asks the user for input once every queued log line has been written, so
+    progress messages never land after the prompt. Must run on the main thread.
+    """
+    log_queue.join()
+    sys.stderr.flush()
+    # asyncio.run's SIGINT handler only cancels the main task, which can't happen
+    # while input() blocks the loop; restore the default so Ctrl-C exits at once.
+    previous = signal.signal(signal.SIGINT, signal.default_int_handler)
+    try:
+        return input(message).strip()
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+# --- Retry Policy ---
+
+class RateLimitError(Exception):
+    """Raised when YouTube or Spotify answers with HTTP 429."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+_backoff = wait_exponential(multiplier=0.5, max=30)
+
+def wait_backoff_or_retry_after(retry_state) -> float:
+    """Waits exponentially, but never less than a 429's Retry-After."""
+    exc = retry_state.outcome.exception()
+    wait = _backoff(retry_state)
+    if isinstance(exc, RateLimitError):
+        wait = max(wait, exc.retry_after)
+    return wait
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Returns whether a failed request is worth retrying: connection errors,
+    timeouts, 429s, and 408/5xx responses. Other HTTP errors (401, 403, 404...)
+    won't go away on retry.
+    """
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status == 408 or exc.status >= 500
+    return isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError, RateLimitError))
+
+# Retries transient network failures and 429s; the whole coroutine is retried,
+# so the semaphore and rate limiter are released while backing off.
+retry_network = retry(
+    wait=wait_backoff_or_retry_after,
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception(is_transient),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
+
+# --- Spotify Pagination ---
+SPOTIFY_PLAYLIST_TRACKS_URL = "https://api.spotify.com/v1/playlists/{playlist_id}/tracks"
+
+@retry_network
+async def fetch_spotify_page(session: aiohttp.ClientSession, token: str, playlist_id: str,
+                             offset: int):
+    """Fetches one page of playlist items from the Spotify Web API."""
+    params = {"offset": offset, "limit": SPOTIFY_PAGE_SIZE, "additional_types": "track"}
+    headers = {"Authorization": f"Bearer {token}"}
+    async with SPOTIFY_SEM:
+        async with session.get(SPOTIFY_PLAYLIST_TRACKS_URL.format(playlist_id=playlist_id),
+                               params=params, headers=headers) as resp:
+            if resp.status == 429:
+                raise RateLimitError(retry_after_seconds(resp))
+            resp.raise_for_status()
+            return await resp.json()
 
 # --- YouTube Search with Caching ---
-@lru_cache(maxsize=200)
-def search_youtube_video(query: str) -> str:
+YOUTUBE_SEARCH_URL = "https://www.youtube.com/results"
+_VIDEO_ID_RE = re.compile(rb'"videoId":"([A-Za-z0-9_-]{11})"')
+
+def pick_video_id(body: bytes) -> str:
+    """Returns the video ID to use from a raw YouTube results page."""
+    # Each video ID shows up several times on the page (thumbnails, links...),
+    # so only the first two distinct IDs are collected.
+    results = []
+    for match in _VIDEO_ID_RE.finditer(body):
+        video_id = match.group(1).decode()
+        if video_id not in results:
+            results.append(video_id)
+            if len(results) == 2:
+                break
+    if len(results) > 1:
+        # Skip the first result if necessary (e.g. if it's not ideal)
+        return results[1]
+    return results[0] if results else None
+
+YDL_OPTS = {
+    'quiet': True,
+    'no_warnings': True,
+    'skip_download': True,
+    'extract_flat': 'in_playlist',
+}
+# extract_info isn't safe to share across threads, so each worker gets its own.
+_ydl_local = threading.local()
+YDL_EXECUTOR = ThreadPoolExecutor(max_workers=16)
+
+def get_ydl() -> YoutubeDL:
+    """Returns this thread's YoutubeDL instance."""
+    if not hasattr(_ydl_local, 'ydl'):
+        _ydl_local.ydl = YoutubeDL(YDL_OPTS)
+    return _ydl_local.ydl
+
+def search_youtube_video_ytdlp(query: str) -> str:
+    """Searches YouTube with yt-dlp's search extractor and returns the video ID."""
+    try:
+        # Always search explicitly, so a track name that looks like a URL isn't
+        # handed to another extractor. Two results so the first one can be
+        # skipped, as with the page scrape.
+        info = get_ydl().extract_info(f"ytsearch2:{query}", download=False)
+    except DownloadError:
+        return None
+    results = [entry['id'] for entry in (info or {}).get('entries') or [] if entry]
+    if len(results) > 1:
+        # Skip the first result if necessary (e.g. if it's not ideal)
+        return results[1]
+    return results[0] if results else None
+
+async def search_youtube_video_async(session: aiohttp.ClientSession, query: str) -> str:
     """
     Searches YouTube for the given query and returns the video ID.
-    Uses pytube's Search and caches results to avoid repeated network calls.
+    Results are cached on disk, so repeated queries skip the network.
     """
-    results = Search(query).results
-    if results and len(results) > 1:
-        # Skip the first result if necessary (e.g. if it's not ideal)
-        video_id = results[1].video_id
-    elif results:
-        video_id = results[0].video_id
-    else:
-        video_id = None
+    key = search_cache_key(query)
+    if (video_id := cache.get(key)) is not None:
+        return video_id
+    video_id = await fetch_youtube_video_id(session, query)
+    if not video_id:
+        # The page scrape breaks when YouTube changes its markup; fall back to
+        # yt-dlp, which tracks those changes.
+        loop = asyncio.get_running_loop()
+        async with SEM, YT_LIMITER:
+            video_id = await loop.run_in_executor(YDL_EXECUTOR, search_youtube_video_ytdlp, query)
+    if video_id:
+        cache.set(key, video_id, expire=CACHE_EXPIRE)
     return video_id
 
+@retry_network
+async def fetch_youtube_video_id(session: aiohttp.ClientSession, query: str) -> str:
+    """
+    Fetches the YouTube results page for the query and returns the video ID.
+    The raw page bytes are scanned with a precompiled regex instead of being
+    decoded and parsed, so many searches can run concurrently on one event loop.
+    """
+    async with SEM, YT_LIMITER:
+        async with session.get(YOUTUBE_SEARCH_URL, params={"search_query": query}) as resp:
+            if resp.status == 429:
+                raise RateLimitError(retry_after_seconds(resp))
+            resp.raise_for_status()
+            body = await resp.read()
+    return pick_video_id(body)
+
 # --- YouTube Data API Setup ---
 SCOPES = ["https://www.googleapis.com/auth/youtube.force-ssl"]
 
-def get_youtube_service():
+def get_youtube_credentials():
     """
-    Authenticates with YouTube via OAuth2 and returns a YouTube API service instance.
+    Authenticates with YouTube via OAuth2 and returns the user credentials.
     This will open a browser window for you to log in.
     """
     # Note: The redirect URI registered in your Google Cloud Console must match
     # the URI used here. Since your Authorized Redirect URI is set to:
     # "http://localhost:8888/callback", we use port 8888.
     flow = InstalledAppFlow.from_client_secrets_file("client_secret.json", SCOPES)
-    creds = flow.run_local_server(port=8888)
+    return flow.run_local_server(port=8888)
+
+def get_youtube_service(creds=None):
+    """
+    Returns a YouTube API service instance, authenticating first if no
+    credentials are given.
+    """
+    if creds is None:
+        creds = get_youtube_credentials()
     youtube = build("youtube", "v3", credentials=creds)
     return youtube
 
@@ -104,71 +457,245 @@ def create_youtube_playlist(youtube, title: str, description: str, privacy_statu
     response = request.execute()
     return response
 
-def add_video_to_playlist(youtube, playlist_id: str, video_id: str):
+def playlist_item_body(playlist_id: str, video_id: str, position: int = None):
+    """
+    Builds the playlistItems insert/update body for a video, optionally pinning
+    it to a position in the playlist.
+    """
+    snippet = {
+        "playlistId": playlist_id,
+        "resourceId": {
+            "kind": "youtube#video",
+            "videoId": video_id
+        }
+    }
+    if position is not None:
+        snippet["position"] = position
+    return {"snippet": snippet}
+
+# YouTube accepts at most 50 sub-requests per batch call.
+YOUTUBE_BATCH_SIZE = 50
+
+def add_videos_to_playlist_batch(youtube, playlist_id: str, video_ids, batch_size=YOUTUBE_BATCH_SIZE):
+    """
+    Adds videos to the specified YouTube playlist using batch requests, packing
+    up to 50 inserts into one HTTP round-trip. The server may run a batch's
+    sub-requests in any order, so videos are appended without positions;
+    reorder_playlist restores track order afterwards.
+    Returns the indexes (into video_ids) of the inserts that failed.
+    """
+    failed = []
+
+    def callback(request_id, response, exception):
+        if exception is not None:
+            failed.append(int(request_id))
+
+    for start in range(0, len(video_ids), batch_size):
+        batch = youtube.new_batch_http_request(callback=callback)
+        for index in range(start, min(start + batch_size, len(video_ids))):
+            request = youtube.playlistItems().insert(
+                part="snippet",
+                body=playlist_item_body(playlist_id, video_ids[index])
+            )
+            # Sub-request IDs must be unique within a batch, so key them by index.
+            batch.add(request, request_id=str(index))
+        batch.execute()
+    return sorted(failed)
+
+def list_playlist_items(youtube, playlist_id: str):
+    """Returns every item in the specified YouTube playlist, in playlist order."""
+    items = []
+    request = youtube.playlistItems().list(part="snippet", playlistId=playlist_id, maxResults=50)
+    while request is not None:
+        response = request.execute()
+        items.extend(response.get("items", []))
+        request = youtube.playlistItems().list_next(request, response)
+    return items
+
+def reorder_playlist(youtube, playlist_id: str, video_ids):
+    """
+    Moves the items of the specified YouTube playlist into the order of video_ids.
+    Only misplaced items are updated, so a playlist that is already in order
+    costs just the listing calls. Returns the number of items moved.
+    """
+    rank = {video_id: index for index, video_id in enumerate(video_ids)}
+    current = list_playlist_items(youtube, playlist_id)
+    wanted = sorted(current, key=lambda item: rank.get(item["snippet"]["resourceId"]["videoId"],
+                                                       len(rank)))
+    moved = 0
+    for position, item in enumerate(wanted):
+        if current[position] is item:
+            continue
+        video_id = item["snippet"]["resourceId"]["videoId"]
+        try:
+            youtube.playlistItems().update(
+                part="snippet",
+                body={"id": item["id"], **playlist_item_body(playlist_id, video_id, position)}
+            ).execute()
+        except HttpError as exc:
+            logger.warning(f"Could not reorder playlist: {exc}")
+            break
+        # Moving an item shifts everything between its old and new position.
+        current.remove(item)
+        current.insert(position, item)
+        moved += 1
+    return moved
+
+@retry_network
+async def add_video_to_playlist_async(session: aiohttp.ClientSession, youtube, token: str,
+                                      playlist_id: str, video_id: str):
     """
     Adds a video (by video ID) to the specified YouTube playlist.
+    The request is built with the API client but sent through aiohttp with the
+    OAuth bearer token, so inserts don't block the event loop.
     """
     request = youtube.playlistItems().insert(
         part="snippet",
-        body={
-            "snippet": {
-                "playlistId": playlist_id,
-                "resourceId": {
-                    "kind": "youtube#video",
-                    "videoId": video_id
-                }
-            }
-        }
+        body=playlist_item_body(playlist_id, video_id)
     )
-    response = request.execute()
-    return response
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    }
+    async with SEM, YT_LIMITER:
+        async with session.request(request.method, request.uri, data=request.body,
+                                   headers=headers) as resp:
+            if resp.status == 429:
+                raise RateLimitError(retry_after_seconds(resp))
+            resp.raise_for_status()
+            return await resp.json()
+
+async def spotify_pager(session: aiohttp.ClientSession, playlist_url: str, queue: asyncio.Queue,
+                        progress):
+    """
+    Feeds (position, query) pairs from the Spotify playlist into the search queue,
+    setting the progress bar's total once the track count is known.
+    """
+    def set_total(total):
+        progress.total = total
+        progress.refresh()
+
+    try:
+        async for item in iter_spotify_tracks(session, playlist_url, on_total=set_total):
+            await queue.put(item)
+    finally:
+        # One sentinel per worker so every consumer stops.
+        for _ in range(N_WORKERS):
+            await queue.put(None)
+
+async def search_worker(session: aiohttp.ClientSession, queue: asyncio.Queue, searches, results,
+                        progress):
+    """Searches YouTube for queued tracks until it receives the sentinel."""
+    while (item := await queue.get()) is not None:
+        position, query = item
+        # Search each distinct query once; duplicates await the same task.
+        key = normalize_query(query)
+        if key not in searches:
+            searches[key] = asyncio.ensure_future(search_youtube_video_async(session, key))
+        try:
+            video_id = await searches[key]
+        except (aiohttp.ClientError, asyncio.TimeoutError, RateLimitError) as exc:
+            # One failed search shouldn't throw away every other result.
+            logger.warning(f"Search failed for: {query} ({exc})")
+            video_id = None
+        results[position] = (query, video_id)
+        progress.update()
 
-def convert_playlist(spotify_playlist_url: str):
+async def convert_playlist(session: aiohttp.ClientSession, spotify_playlist_url: str):
     """
     Converts a Spotify playlist to a list of YouTube video URLs.
-    This function fetches track queries from Spotify and uses the YouTube search
-    to find matching video IDs.
+    Spotify pages are streamed into a queue while a pool of workers runs the
+    YouTube searches, so the two phases overlap instead of running back to back.
     """
-    print("Fetching Spotify playlist...")
-    track_queries = get_spotify_tracks(spotify_playlist_url)
+    logger.info("Fetching Spotify playlist...")
+    queue = asyncio.Queue(maxsize=TRACK_QUEUE_SIZE)
+    searches = {}
+    results = {}
+    with tqdm(desc="Searching YouTube", unit="track") as progress:
+        await asyncio.gather(
+            spotify_pager(session, spotify_playlist_url, queue, progress),
+            *[search_worker(session, queue, searches, results, progress)
+              for _ in range(N_WORKERS)],
+        )
+        # Empty playlist slots are never searched; close the bar at 100%.
+        progress.total = progress.n
     youtube_links = []
-    for query in track_queries:
-        print(f"Searching YouTube for: {query}")
-        vid_id = search_youtube_video(query)
+    for position in sorted(results):
+        query, vid_id = results[position]
         if vid_id:
             yt_url = f"https://www.youtube.com/watch?v={vid_id}"
             youtube_links.append(yt_url)
-            print(f"Found: {yt_url}")
+            logger.info(f"Found: {yt_url}")
         else:
-            print(f"No match found for: {query}")
+            logger.info(f"No match found for: {query}")
     return youtube_links
 
-if __name__ == '__main__':
+async def main():
+    listener = setup_logging()
+    token_refresher = asyncio.create_task(keep_spotify_token_fresh())
+    try:
+        async with make_session() as session:
+            await sync_playlist(session)
+    finally:
+        token_refresher.cancel()
+        listener.stop()
+
+async def sync_playlist(session: aiohttp.ClientSession):
     # Prompt the user for the Spotify playlist URL.
-    spotify_url = input("Enter Spotify playlist URL: ").strip()
-    yt_links = convert_playlist(spotify_url)
+    # The Spotify token is fetched in the background while the user types.
+    prefetch_spotify_token()
+    spotify_url = prompt("Enter Spotify playlist URL: ")
+    yt_links = await convert_playlist(session, spotify_url)
     
     # Authenticate with YouTube.
-    print("\nAuthenticating with YouTube...")
-    youtube = get_youtube_service()
+    logger.info("\nAuthenticating with YouTube...")
+    creds = get_youtube_credentials()
+    youtube = get_youtube_service(creds)
     
     # Prompt for new YouTube playlist details.
-    playlist_title = input("Enter new YouTube playlist title: ").strip()
-    playlist_description = input("Enter playlist description: ").strip()
+    playlist_title = prompt("Enter new YouTube playlist title: ")
+    playlist_description = prompt("Enter playlist description: ")
     
     # Create the new YouTube playlist.
     playlist_response = create_youtube_playlist(youtube, playlist_title, playlist_description)
     playlist_id = playlist_response['id']
-    print(f"\nYouTube Playlist Created! Playlist ID: {playlist_id}")
-    print(f"View it here: https://www.youtube.com/playlist?list={playlist_id}")
+    logger.info(f"\nYouTube Playlist Created! Playlist ID: {playlist_id}")
+    logger.info(f"View it here: https://www.youtube.com/playlist?list={playlist_id}")
     
-    # Add each video to the YouTube playlist.
-    count = 0
+    # Add the videos to the YouTube playlist in batches.
+    # Extract the video ID from each URL, skipping videos already queued.
+    video_ids = []
+    seen: set[str] = set()
     for link in yt_links:
-        # Extract the video ID from the URL.
-        video_id = link.split("v=")[-1]
-        add_video_to_playlist(youtube, playlist_id, video_id)
-        count += 1
-        print(f"Added video {count}/{len(yt_links)}")
+        video_id = extract_youtube_video_id_from_url(link)
+        if video_id not in seen:
+            seen.add(video_id)
+            video_ids.append(video_id)
+    failed = add_videos_to_playlist_batch(youtube, playlist_id, video_ids)
+    
+    # Retry any inserts that failed inside a batch (including 409 conflicts from
+    # writes to the same playlist landing together) one at a time.
+    still_failed = []
+    if failed:
+        logger.info(f"Retrying {len(failed)} failed inserts...")
+        for index in tqdm(failed, desc="Retrying inserts", unit="video"):
+            video_id = video_ids[index]
+            try:
+                await add_video_to_playlist_async(session, youtube, creds.token, playlist_id,
+                                                  video_id)
+            except (aiohttp.ClientError, asyncio.TimeoutError, RateLimitError) as exc:
+                logger.warning(f"Could not add video {video_id}: {exc}")
+                still_failed.append(video_id)
     
-    print(f"\nPlaylist sync complete! Total {count} videos added.")
+    # Batched and retried inserts land in arbitrary order; put them in track order.
+    moved = reorder_playlist(youtube, playlist_id, video_ids)
+    if moved:
+        logger.info(f"Moved {moved} videos back into track order.")
+    count = len(video_ids) - len(still_failed)
+    
+    logger.info(f"\nPlaylist sync complete! Total {count} videos added.")
+    if still_failed:
+        logger.info(f"{len(still_failed)} videos could not be added: {', '.join(still_failed)}")
+
+if __name__ == '__main__':
+    asyncio.run(main())